@@ -2,6 +2,7 @@ import streamlit as st
 from experta import *
 import numpy as np
 from scipy.stats import norm
+from boundary_map import decision_map, legend, render_rgb
 
 
 # Define a Fact class for storm characteristics
@@ -12,8 +13,11 @@ class Storm(Fact):
 
 # Define the expert system class
 class StormExpertSystem(KnowledgeEngine):
-    classifications = []
-    advices = []
+    def __init__(self):
+        super().__init__()
+        # Per engine, so results do not pile up across Streamlit reruns
+        self.classifications = []
+        self.advices = []
 
     # Define mean and standard deviation for each category
     categories = {
@@ -43,7 +47,9 @@ class StormExpertSystem(KnowledgeEngine):
         "Calm": "No action needed."
     }
 
-    @Rule(Storm(wind_speed=MATCH.wind_speed, pressure=MATCH.pressure, temperature=MATCH.temperature))
+    # Salience makes this fire before the crisp rules, whose adjustments would
+    # otherwise be applied to an empty list and lost
+    @Rule(Storm(wind_speed=MATCH.wind_speed, pressure=MATCH.pressure, temperature=MATCH.temperature), salience=1)
     def classify_storm(self, wind_speed, pressure, temperature):
         for category, params in self.categories.items():
             wind_log_prob = np.log(norm.pdf(wind_speed, params["wind_speed"][0], params["wind_speed"][1]) + 1e-10)
@@ -124,6 +130,14 @@ def main():
     pressure = st.slider("Pressure (hPa)", min_value=900, max_value=1050, value=1000, step=1)
     temperature = st.slider("Temperature (°C)", min_value=-20, max_value=40, value=25, step=1)
 
+    # Category boundaries around the current reading; humidity is left out so
+    # it is marginalized, matching this app's three-feature model
+    categories, confidence, xs, ys = decision_map("wind_speed", "pressure", temperature=temperature)
+    st.image(render_rgb(categories, confidence, xs, ys, marker=(wind_speed, pressure)), width=400,
+             caption=f"Wind speed 0-150 mph (x) vs pressure 900-1050 hPa (y) at {temperature} °C")
+    st.markdown(" ".join(f'<span style="background-color:{color}">&nbsp;{category}&nbsp;</span>'
+                         for category, color in legend()), unsafe_allow_html=True)
+
     # Run the expert system when the user clicks the button
     if st.button("Classify Storm"):
         # Initialize the expert system
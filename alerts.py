@@ -0,0 +1,82 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from scoring import TIER_ADVICE, TIER_BOUNDS_KM, default_model
+
+
+class AlertStream:
+    """Turn a continuous feed of classifications into change-only alerts.
+
+    State is kept per key (a station or location id): the reported top
+    category and distance tier. A new top category is reported only once its
+    posterior beats the reported one by more than margin, and a tier change
+    only once the distance is tier_hysteresis_km past the 50/100/200 km
+    boundary, so readings hovering on a boundary do not flap. At most max_keys
+    keys are tracked; the least recently updated are forgotten first and
+    start over as new keys.
+    """
+
+    def __init__(self, categories=None, margin=0.1, tier_hysteresis_km=5.0, max_keys=100_000):
+        self.categories = list(categories) if categories is not None else default_model().names
+        self.margin = margin
+        self.outward_bounds = np.asarray(TIER_BOUNDS_KM, dtype=float) + tier_hysteresis_km
+        self.inward_bounds = np.asarray(TIER_BOUNDS_KM, dtype=float) - tier_hysteresis_km
+        self.max_keys = max_keys
+        self.state = OrderedDict()
+
+    def _tier(self, distance, tier):
+        if distance is None or np.isnan(distance):
+            return tier
+        if tier is None:
+            return int(np.searchsorted(TIER_BOUNDS_KM, distance, side="right"))
+        outward = int(np.searchsorted(self.outward_bounds, distance, side="right"))
+        inward = int(np.searchsorted(self.inward_bounds, distance, side="right"))
+        if outward > tier:
+            return outward
+        if inward < tier:
+            return inward
+        return tier
+
+    def _update(self, key, top, posterior, distance):
+        previous = self.state.get(key)
+        if previous is None:
+            category, tier = top, self._tier(distance, None)
+        else:
+            category, tier = previous
+            if top != category and posterior[top] - posterior[category] > self.margin:
+                category = top
+            tier = self._tier(distance, tier)
+
+        self.state[key] = (category, tier)
+        self.state.move_to_end(key)
+        if len(self.state) > self.max_keys:
+            self.state.popitem(last=False)
+
+        if previous == (category, tier):
+            return None
+        return {
+            "key": key,
+            "category": self.categories[category],
+            "probability": float(posterior[category]),
+            "tier": tier,
+            "advice": None if tier is None else TIER_ADVICE[tier],
+            "previous_category": None if previous is None else self.categories[previous[0]],
+            "previous_tier": None if previous is None else previous[1],
+        }
+
+    def push(self, key, posterior, distance=None):
+        """Feed one posterior row (and distance in km); returns an alert dict or None."""
+        posterior = np.asarray(posterior)
+        return self._update(key, int(posterior.argmax()), posterior, distance)
+
+    def push_batch(self, keys, posteriors, distances=None):
+        """Feed rows of a posterior matrix in order; returns the alerts they raised."""
+        posteriors = np.asarray(posteriors)
+        tops = posteriors.argmax(axis=1)
+        alerts = []
+        for i, key in enumerate(keys):
+            alert = self._update(key, tops[i], posteriors[i], None if distances is None else distances[i])
+            if alert is not None:
+                alerts.append(alert)
+        return alerts
@@ -1,20 +1,19 @@
 import tkinter as tk
 from tkinter import ttk
-from rules_final import Storm, StormExpertSystem
-import random
-from geopy.distance import geodesic
+from rules_final import StormExpertSystem
+from boundary_map import decision_map, legend, render_rgb
+from whatif import WhatIf
+
+# Kept between runs so a change to one input only recomputes what depends on it
+what_if = WhatIf()
 
 def run_expert_system(wind_speed, pressure, temperature, humidity, storm_location, user_location, results_frame):
-    engine = StormExpertSystem()
-    engine.reset()
-    engine.classifications = []
-    engine.advices = []
-    engine.declare(Storm(wind_speed=wind_speed, pressure=pressure, temperature=temperature, humidity=humidity, storm_location=storm_location, user_location=user_location))
-    engine.run()
-    engine.normalize_probabilities()
+    # Missing readings (None) are marginalized out of the model rather than guessed
+    classifications = what_if.update(wind_speed=wind_speed, pressure=pressure, temperature=temperature, humidity=humidity, storm_location=storm_location, user_location=user_location)
+    advices = what_if.advices()
 
-    sorted_classifications = sorted(engine.classifications, key=lambda x: x[1], reverse=True)
-    sorted_advices = sorted(engine.advices, key=lambda x: x[1], reverse=True)
+    sorted_classifications = sorted(classifications, key=lambda x: x[1], reverse=True)
+    sorted_advices = sorted(advices, key=lambda x: x[1], reverse=True)
 
     for widget in results_frame.winfo_children():
         widget.destroy()
@@ -35,9 +34,20 @@ def run_expert_system(wind_speed, pressure, temperature, humidity, storm_locatio
     tk.Label(results_frame, text="Additional Advice", font=("Arial", 14, "bold"), bg="#e3e4fa").pack(pady=5)
     for classification, probability in sorted_classifications:
         if probability > 0.02:
-            advice = engine.advice_map.get(classification, "No additional advice available.")
+            advice = StormExpertSystem.advice_map.get(classification, "No additional advice available.")
             tk.Label(results_frame, text=f"{advice} (Probability: {probability:.4f})", fg="purple", bg="#e3e4fa", font=("Arial", 11)).pack(anchor="center", padx=10)
 
+def draw_boundary_map(canvas, wind_speed, pressure, temperature, humidity):
+    categories, confidence, xs, ys = decision_map("wind_speed", "pressure", temperature=temperature, humidity=humidity)
+    marker = None if wind_speed is None or pressure is None else (wind_speed, pressure)
+    image = render_rgb(categories, confidence, xs, ys, marker)
+    photo = tk.PhotoImage(width=image.shape[1], height=image.shape[0])
+    photo.put(" ".join("{" + " ".join("#%02x%02x%02x" % tuple(pixel) for pixel in row) + "}" for row in image))
+    photo = photo.zoom(2)
+    canvas.delete("all")
+    canvas.create_image(0, 0, anchor="nw", image=photo)
+    canvas.image = photo  # Tk drops images that have no Python reference
+
 def main():
     root = tk.Tk()
     root.title("Extreme Weather Expert System")
@@ -96,12 +106,6 @@ def main():
     results_frame = tk.Frame(frame, bg="#e3e4fa", padx=20, pady=20)
     results_frame.pack(pady=20)
 
-    def get_random_value(min_val, max_val):
-        return random.randint(min_val, max_val)
-
-    def get_random_location():
-        return (random.uniform(-90, 90), random.uniform(-180, 180))
-
     def parse_location(entry):
         try:
             lat, lon = map(float, entry.split(','))
@@ -109,49 +113,28 @@ def main():
         except ValueError:
             return None
 
-    def estimate_missing_values(temperature, humidity):
-        # Example heuristics for estimating missing values
-        if temperature is None and humidity is None:
-            temperature = 20  # Default temperature
-            humidity = 50  # Default humidity
-        elif temperature is None:
-            if humidity > 70:
-                temperature = 25  # High humidity typically means warmer temperatures
-            elif humidity < 30:
-                temperature = 10  # Low humidity typically means cooler temperatures
-            else:
-                temperature = 20  # Default temperature
-        elif humidity is None:
-            if temperature > 30:
-                humidity = 70  # Warmer temperatures typically mean higher humidity
-            elif temperature < 10:
-                humidity = 30  # Cooler temperatures typically mean lower humidity
-            else:
-                humidity = 50  # Default humidity
-        else:
-            if temperature > 30 and humidity is None:
-                humidity = 70  # Warmer temperatures typically mean higher humidity
-            elif temperature < 10 and humidity is None:
-                humidity = 30  # Cooler temperatures typically mean lower humidity
-            elif humidity > 70 and temperature is None:
-                temperature = 25  # High humidity typically means warmer temperatures
-            elif humidity < 30 and temperature is None:
-                temperature = 10  # Low humidity typically means cooler temperatures
-
-        return temperature, humidity
+    def parse_reading(entry):
+        # Called on every keystroke, so half-typed text counts as missing
+        try:
+            return int(entry.get())
+        except ValueError:
+            return None
 
-    run_button = tk.Button(
-        frame,
-        text="Classify",
-        command=lambda: run_expert_system(
-            int(wind_speed_entry.get()) if wind_speed_entry.get() else get_random_value(0, 150),
-            int(pressure_entry.get()) if pressure_entry.get() else get_random_value(900, 1050),
-            temperature_slider.get() if temperature_slider.get() else None,
-            humidity_slider.get() if humidity_slider.get() else None,
+    def classify(event=None):
+        run_expert_system(
+            parse_reading(wind_speed_entry),
+            parse_reading(pressure_entry),
+            temperature_slider.get(),
+            humidity_slider.get(),
             parse_location(storm_location_entry.get()) if storm_location_entry.get() else None,
             parse_location(user_location_entry.get()) if user_location_entry.get() else None,
             results_frame,
-        ),
+        )
+
+    run_button = tk.Button(
+        frame,
+        text="Classify",
+        command=classify,
         font=("Arial", 12, "bold"),
         bg="#4CAF50",
         fg="white",
@@ -164,6 +147,42 @@ def main():
     )
     run_button.pack(pady=10)
 
+    map_window = {}
+
+    def update_boundary_map(event=None):
+        if "window" not in map_window or not map_window["window"].winfo_exists():
+            return
+        draw_boundary_map(
+            map_window["canvas"],
+            parse_reading(wind_speed_entry),
+            parse_reading(pressure_entry),
+            temperature_slider.get(),
+            humidity_slider.get(),
+        )
+
+    def open_boundary_map():
+        if "window" not in map_window or not map_window["window"].winfo_exists():
+            window = tk.Toplevel(root)
+            window.title("Decision Boundaries: Wind Speed (x, 0-150 mph) vs Pressure (y, 900-1050 hPa)")
+            window.configure(bg="#f0f8ff")
+            canvas = tk.Canvas(window, width=400, height=300, highlightthickness=0)
+            canvas.pack(side="left", padx=10, pady=10)
+            legend_frame = tk.Frame(window, bg="#f0f8ff")
+            legend_frame.pack(side="left", padx=10)
+            for category, color in legend():
+                tk.Label(legend_frame, text=category, bg=color, font=("Arial", 10), width=22).pack(anchor="w", pady=1)
+            map_window.update(window=window, canvas=canvas)
+        update_boundary_map()
+
+    tk.Button(frame, text="Boundary Map", command=open_boundary_map, font=("Arial", 12), padx=10, pady=5).pack()
+    for slider in (temperature_slider, humidity_slider):
+        slider.bind("<ButtonRelease-1>", classify, add="+")
+        slider.bind("<ButtonRelease-1>", update_boundary_map, add="+")
+    # <KeyRelease> also covers Return, so typing or confirming a value redraws
+    for entry in (wind_speed_entry, pressure_entry):
+        entry.bind("<KeyRelease>", classify, add="+")
+        entry.bind("<KeyRelease>", update_boundary_map, add="+")
+
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+import os
+
+import numpy as np
+
+from scoring import FEATURES, classify_columns, default_model, distance_km, distance_tier
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+COORDINATE_COLUMNS = ("storm_lat", "storm_lon", "user_lat", "user_lon")
+CHUNK_SIZE = 1 << 18
+
+
+def open_npy_columns(directory, names=FEATURES + COORDINATE_COLUMNS):
+    """Memory-map <name>.npy for every column present in directory."""
+    columns = {}
+    for name in names:
+        path = os.path.join(directory, name + ".npy")
+        if os.path.exists(path):
+            columns[name] = np.load(path, mmap_mode="r")
+    lengths = {len(column) for column in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"Columns in {directory} have different lengths: {sorted(lengths)}")
+    return columns
+
+
+def _require_features(names, source):
+    missing = [name for name in FEATURES if name not in names]
+    if missing:
+        raise KeyError(f"Archive {source} is missing columns: {', '.join(missing)}")
+
+
+def _iter_npy_chunks(directory, chunk_size):
+    # Chunks are read into reused buffers rather than sliced from the memory
+    # maps: mapped pages stay resident once touched, so peak RSS would grow
+    # with the archive instead of staying near one chunk.
+    columns = open_npy_columns(directory)
+    _require_features(columns, directory)
+    n = len(columns[FEATURES[0]])
+    layout = {name: (column.filename, column.offset, column.dtype) for name, column in columns.items()}
+    del columns
+    buffers = {name: np.empty(chunk_size, dtype=dtype) for name, (_, _, dtype) in layout.items()}
+    files = {name: open(filename, "rb") for name, (filename, _, _) in layout.items()}
+    try:
+        for start in range(0, n, chunk_size):
+            count = min(chunk_size, n - start)
+            chunk = {}
+            for name, (filename, offset, dtype) in layout.items():
+                f = files[name]
+                f.seek(offset + start * dtype.itemsize)
+                view = buffers[name][:count]
+                if f.readinto(view) != view.nbytes:
+                    raise ValueError(f"{filename} is shorter than its header says")
+                chunk[name] = view
+            yield start, chunk
+    finally:
+        for f in files.values():
+            f.close()
+
+
+def _batch_columns(batch, names):
+    # Arrow buffers are exposed directly when the column has no nulls; other
+    # columns are never converted, so they cannot turn into Python objects
+    return {name: batch.column(name).to_numpy(zero_copy_only=False) for name in names}
+
+
+def _wanted_columns(names, path):
+    _require_features(names, path)
+    return [name for name in FEATURES + COORDINATE_COLUMNS if name in names]
+
+
+def _iter_arrow_chunks(path, chunk_size):
+    if pa is None:
+        raise ImportError("pyarrow is required to read Arrow and Parquet archives")
+    start = 0
+    if path.endswith(".parquet"):
+        parquet_file = pq.ParquetFile(pa.memory_map(path))
+        names = _wanted_columns(parquet_file.schema_arrow.names, path)
+        batches = parquet_file.iter_batches(batch_size=chunk_size, columns=names)
+    else:
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        names = _wanted_columns(reader.schema.names, path)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    for batch in batches:
+        # IPC record batches are memory-mapped, so slicing them copies nothing
+        for offset in range(0, batch.num_rows, chunk_size):
+            yield start, _batch_columns(batch.slice(offset, chunk_size), names)
+            start += min(chunk_size, batch.num_rows - offset)
+
+
+def iter_chunks(source, chunk_size=CHUNK_SIZE):
+    """Yield (first row, {column: 1-D array}) chunks of an observation archive.
+
+    source is a directory of .npy files or a .parquet/.arrow/.feather file.
+    Raises KeyError if any of FEATURES is absent. Chunks of a .npy directory
+    are read into buffers reused for the next chunk, so copy what must last.
+    """
+    if os.path.isdir(source):
+        return _iter_npy_chunks(source, chunk_size)
+    return _iter_arrow_chunks(source, chunk_size)
+
+
+def classify_archive(source, chunk_size=CHUNK_SIZE, model=None):
+    """Classify an archive chunk by chunk.
+
+    Yields (first row, category indices, posteriors, distance tiers); tiers is
+    None when the archive has no coordinate columns. Tiers use the spherical
+    scoring.distance_km, so a pair within about 1.2 km of a tier bound can get
+    a different tier than classify_storm's geodesic distance gives it. The
+    score buffer is reused, so copy posteriors that must outlive the next chunk.
+    """
+    model = model or default_model()
+    buffer = np.empty((chunk_size, len(model.names)))
+    for start, chunk in iter_chunks(source, chunk_size):
+        categories, scores = classify_columns(model, [np.asarray(chunk[name], dtype=float) for name in FEATURES],
+                                              buffer)
+        tiers = None
+        if all(name in chunk for name in COORDINATE_COLUMNS):
+            tiers = distance_tier(distance_km(*(chunk[name] for name in COORDINATE_COLUMNS)))
+        yield start, categories, scores, tiers
@@ -0,0 +1,68 @@
+from functools import lru_cache
+
+import numpy as np
+
+from scoring import FEATURES, as_columns, classify_columns, default_model
+
+# Input ranges of the sliders in the UIs
+RANGES = {"wind_speed": (0, 150), "pressure": (900, 1050), "temperature": (-20, 40), "humidity": (0, 100)}
+
+# One color per category, in StormExpertSystem.categories order
+PALETTE = np.array([
+    (244, 165, 130), (214, 96, 77), (178, 24, 43),
+    (166, 219, 160), (90, 174, 97), (27, 120, 55),
+    (146, 197, 222), (67, 147, 195), (33, 102, 172),
+    (240, 240, 240),
+], dtype=np.uint8)
+
+
+@lru_cache(maxsize=64)
+def _decision_map(x_feature, y_feature, fixed, width, height):
+    model = default_model()
+    xs = np.linspace(*RANGES[x_feature], width)
+    ys = np.linspace(*RANGES[y_feature], height)
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    values = dict(fixed)
+    values[x_feature] = grid_x.ravel()
+    values[y_feature] = grid_y.ravel()
+    categories, scores = classify_columns(model, as_columns(*(values.get(f) for f in FEATURES)))
+    categories = categories.astype(np.uint8).reshape(height, width)
+    confidence = scores.max(axis=1).astype(np.float32).reshape(height, width)
+    for array in (xs, ys, categories, confidence):
+        array.setflags(write=False)
+    return categories, confidence, xs, ys
+
+
+def decision_map(x_feature="wind_speed", y_feature="pressure", width=200, height=150, **fixed):
+    """Top category and its posterior over a 2-D slice of the input space.
+
+    x_feature and y_feature span their RANGES on a width x height grid; the
+    other features are held at the values given as keyword arguments, and any
+    left out are marginalized. Returns (categories, confidence, xs, ys) with
+    maps indexed [y, x]. Results are cached (fixed values are rounded to 0.1),
+    so the arrays are read-only.
+    """
+    fixed = tuple(sorted((f, round(float(v), 1)) for f, v in fixed.items() if v is not None))
+    return _decision_map(x_feature, y_feature, fixed, width, height)
+
+
+def render_rgb(categories, confidence, xs=None, ys=None, marker=None):
+    """Color a decision map as an RGB image with the largest y on the top row.
+
+    Darker shades mean a less certain top category. marker is an optional
+    (x, y) reading, drawn as a black cross when xs and ys are given.
+    """
+    shade = 0.35 + 0.65 * confidence[..., None]
+    image = (PALETTE[categories % len(PALETTE)] * shade).astype(np.uint8)
+    if marker is not None and xs is not None and ys is not None:
+        col = int(np.clip(np.searchsorted(xs, marker[0]), 0, len(xs) - 1))
+        row = int(np.clip(np.searchsorted(ys, marker[1]), 0, len(ys) - 1))
+        image[row, max(col - 4, 0):col + 5] = 0
+        image[max(row - 4, 0):row + 5, col] = 0
+    return image[::-1]
+
+
+def legend(model=None):
+    """(category, "#rrggbb") pairs matching the colors of render_rgb."""
+    model = model or default_model()
+    return [(name, "#%02x%02x%02x" % tuple(PALETTE[i % len(PALETTE)])) for i, name in enumerate(model.names)]
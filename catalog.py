@@ -0,0 +1,128 @@
+import numpy as np
+
+from scoring import PDF_FLOOR, as_columns, rule_mask
+
+
+def _split(ids, points, leaf_size):
+    # KD-tree style: halve along the widest dimension until groups are small
+    if len(ids) <= leaf_size:
+        return [ids]
+    spread = points[ids].max(axis=0) - points[ids].min(axis=0)
+    order = ids[np.argsort(points[ids, spread.argmax()], kind="stable")]
+    half = len(order) // 2
+    return _split(order[:half], points, leaf_size) + _split(order[half:], points, leaf_size)
+
+
+def top_k_exhaustive(scores, k):
+    """Top-k (indices, scores) of a full score matrix; ties go to the lower index."""
+    index = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    order = np.lexsort((index, -scores), axis=-1)[:, :k]
+    return order, np.take_along_axis(scores, order, axis=1)
+
+
+class CatalogIndex:
+    """Exact top-k category scoring for catalogs with hundreds of categories.
+
+    Categories are grouped by their means in standardized feature space and
+    each group keeps a bounding box of its means and standard deviations. For
+    a reading, that box gives an upper bound on every member's log-likelihood,
+    so groups are scored best bound first and the rest are skipped once no
+    bound can beat the current k-th best. Results equal the top k of
+    scoring.log_scores, including ties.
+    """
+
+    def __init__(self, model, leaf_size=None):
+        self.model = model
+        n = len(model.names)
+        leaf_size = leaf_size or max(4, int(np.sqrt(n)))
+        groups = _split(np.arange(n), model.means / model.stds.mean(axis=0), leaf_size)
+
+        self.members = np.full((len(groups), max(len(g) for g in groups)), -1, dtype=np.int64)
+        for i, group in enumerate(groups):
+            self.members[i, :len(group)] = np.sort(group)
+        self.mean_lo = np.array([model.means[g].min(axis=0) for g in groups])
+        self.mean_hi = np.array([model.means[g].max(axis=0) for g in groups])
+        self.std_hi = np.array([model.stds[g].max(axis=0) for g in groups])
+        self.log_norm_hi = np.array([model.log_norm[g].max(axis=0) for g in groups])
+
+        # Crisp rules per category, padded with -1, in the order log_scores applies them
+        per_category = [[r for r, rule in enumerate(model.rules) if rule[0] == c] for c in range(n)]
+        width = max([1] + [len(rules) for rules in per_category])
+        self.category_rules = np.full((n, width), -1, dtype=np.int64)
+        for c, rules in enumerate(per_category):
+            self.category_rules[c, :len(rules)] = rules
+        self.rule_log_conf = np.array([log_conf for _, log_conf, _ in model.rules])
+        # Rules with a confidence above 1 raise a score, so they raise the bound too
+        boosts = np.zeros(n)
+        for category, log_conf, _ in model.rules:
+            boosts[category] += max(log_conf, 0.0)
+        self.group_boost = np.array([boosts[g].max() for g in groups])
+        self.scored = 0
+
+    def _bounds(self, columns):
+        bounds = np.tile(self.group_boost, (len(columns[0]), 1))
+        for f, x in enumerate(columns):
+            x = x[:, None]
+            gap = np.maximum(np.maximum(self.mean_lo[:, f] - x, x - self.mean_hi[:, f]), 0.0)
+            term = np.log(np.exp(self.log_norm_hi[:, f] - 0.5 * (gap / self.std_hi[:, f]) ** 2) + PDF_FLOOR)
+            bounds += np.where(np.isnan(x), 0.0, term)
+        return bounds
+
+    def _exact(self, columns, rows, categories, masks):
+        # Same operations in the same order as scoring.log_scores, so the
+        # scores match it bit for bit
+        model = self.model
+        valid = categories >= 0
+        categories = np.where(valid, categories, 0)
+        scores = np.zeros(categories.shape)
+        for f, x in enumerate(columns):
+            x = x[rows, None]
+            term = x - model.means[categories, f]
+            term /= model.stds[categories, f]
+            np.square(term, out=term)
+            term *= -0.5
+            term += model.log_norm[categories, f]
+            np.exp(term, out=term)
+            term += PDF_FLOOR
+            np.log(term, out=term)
+            term[np.broadcast_to(np.isnan(x), term.shape)] = 0.0
+            scores += term
+
+        for j in range(self.category_rules.shape[1]):
+            rule = self.category_rules[categories, j]
+            hit = (rule >= 0) & masks[rows[:, None], np.maximum(rule, 0)]
+            scores[hit] += self.rule_log_conf[rule[hit]]
+        scores[~valid] = -np.inf
+        return scores
+
+    def top_k(self, wind_speed, pressure, temperature, humidity, k=3):
+        """Top-k (category indices, log scores) per reading, best first; k is capped at the catalog size."""
+        k = min(k, len(self.model.names))
+        columns = as_columns(wind_speed, pressure, temperature, humidity)
+        n = len(columns[0])
+        masks = np.zeros((n, max(1, len(self.model.rules))), dtype=bool)
+        for r, (_, _, conditions) in enumerate(self.model.rules):
+            masks[:, r] = rule_mask(conditions, columns)
+
+        bounds = self._bounds(columns)
+        order = np.argsort(-bounds, axis=1, kind="stable")
+        best = np.full((n, k), -np.inf)
+        best_index = np.full((n, k), np.iinfo(np.int64).max, dtype=np.int64)
+        rows = np.arange(n)
+        for rank in range(order.shape[1]):
+            groups = order[rows, rank]
+            # >= keeps scoring while a tie with the k-th best is still possible
+            rows = rows[bounds[rows, groups] >= best[rows, k - 1]]
+            if not len(rows):
+                break
+            categories = self.members[order[rows, rank]]
+            scores = self._exact(columns, rows, categories, masks)
+            self.scored += int((categories >= 0).sum())
+
+            merged = np.concatenate([best[rows], scores], axis=1)
+            merged_index = np.concatenate([best_index[rows], np.where(categories >= 0, categories, best_index.max())],
+                                          axis=1)
+            keep = np.lexsort((merged_index, -merged), axis=-1)[:, :k]
+            best[rows] = np.take_along_axis(merged, keep, axis=1)
+            best_index[rows] = np.take_along_axis(merged_index, keep, axis=1)
+        return best_index, best
@@ -0,0 +1,81 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from geopy.distance import geodesic
+
+from scoring import as_columns, classify_columns, classify_observation, default_model, distance_advices
+
+CHUNK_SIZE = 1 << 16
+
+
+def classify(wind_speed, pressure, temperature, humidity, storm_location=None, user_location=None, model=None):
+    """Reentrant single classification, safe to call from any number of threads.
+
+    Returns (classifications, advices) like a StormExpertSystem run after
+    normalize_probabilities, with the distance advice only when both
+    locations are given. Nothing is shared between calls except the
+    read-only model.
+    """
+    classifications = classify_observation(wind_speed, pressure, temperature, humidity, model)
+    advices = []
+    if storm_location is not None and user_location is not None:
+        advices = distance_advices(geodesic(storm_location, user_location).kilometers)
+    return classifications, advices
+
+
+def classify_batch(wind_speed, pressure, temperature, humidity, workers=4, chunk_size=CHUNK_SIZE, model=None):
+    """Category indices and posteriors for a batch, chunks spread over a thread pool.
+
+    NumPy releases the GIL inside the ufuncs, so chunks score in parallel.
+    Each chunk writes only its own slice of the preallocated results.
+    """
+    model = model or default_model()
+    columns = as_columns(wind_speed, pressure, temperature, humidity)
+    n = len(columns[0])
+    categories = np.empty(n, dtype=np.int64)
+    scores = np.empty((n, len(model.names)))
+
+    def run(start):
+        stop = start + chunk_size
+        categories[start:stop], _ = classify_columns(model, [x[start:stop] for x in columns], scores[start:stop])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(run, range(0, n, chunk_size)))
+    return categories, scores
+
+
+def check_concurrency(threads=8, readings=200, seed=0):
+    """Classify the same readings serially and from many threads at once; True if all results match."""
+    rng = np.random.default_rng(seed)
+    inputs = [(float(rng.uniform(0, 150)), float(rng.uniform(900, 1050)), float(rng.uniform(-20, 40)),
+               float(rng.uniform(0, 100)), (0.0, 0.0), (float(rng.uniform(-2, 2)), float(rng.uniform(-2, 2))))
+              for _ in range(readings)]
+    expected = [classify(*reading) for reading in inputs]
+    barrier = threading.Barrier(threads)
+
+    def worker(offset):
+        barrier.wait()
+        return all(classify(*inputs[i]) == expected[i] for i in range(offset, readings, threads))
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return all(pool.map(worker, range(threads)))
+
+
+def benchmark(n=2_000_000, thread_counts=(1, 2, 4, 8), seed=0):
+    """Batch throughput for each thread count."""
+    rng = np.random.default_rng(seed)
+    columns = [rng.uniform(low, high, n) for low, high in ((0, 150), (900, 1050), (-20, 40), (0, 100))]
+    serial = None
+    for workers in thread_counts:
+        start = time.perf_counter()
+        categories, _ = classify_batch(*columns, workers=workers)
+        elapsed = time.perf_counter() - start
+        serial = serial or elapsed
+        print(f"{workers} threads: {n / elapsed:,.0f} readings/s ({serial / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    print("Concurrent results match serial:", check_concurrency())
+    benchmark()
@@ -0,0 +1,85 @@
+import numpy as np
+
+from scoring import FEATURE_INDEX, as_columns, default_model, log_scores, posteriors
+
+# Fuzzy model of ST_test_fuzzy: triangular sets (a, b, c) per feature, and
+# each category as the min of a few memberships.
+FUZZY_SETS = {
+    ("wind_speed", "low"): (0, 0, 50),
+    ("wind_speed", "medium"): (30, 75, 120),
+    ("wind_speed", "high"): (90, 150, 150),
+    ("pressure", "high"): (1010, 1050, 1050),
+    ("pressure", "medium"): (980, 1010, 1030),
+    ("pressure", "low"): (900, 950, 1000),
+    ("temperature", "cold"): (-20, -10, 0),
+    ("temperature", "moderate"): (0, 20, 30),
+    ("temperature", "hot"): (20, 40, 40),
+    ("humidity", "low"): (0, 20, 40),
+    ("humidity", "medium"): (30, 60, 90),
+    ("humidity", "high"): (60, 80, 100),
+}
+
+FUZZY_RULES = {
+    "Calm": (("wind_speed", "low"), ("pressure", "high"), ("humidity", "low")),
+    "Mild Thunderstorm": (("wind_speed", "medium"), ("temperature", "hot"), ("pressure", "medium"),
+                          ("humidity", "medium")),
+    "Moderate Thunderstorm": (("wind_speed", "high"), ("temperature", "hot"), ("pressure", "medium"),
+                              ("humidity", "high")),
+    "Mild Winter Storm": (("wind_speed", "medium"), ("temperature", "cold"), ("pressure", "low"),
+                          ("humidity", "medium")),
+    "Moderate Hurricane": (("wind_speed", "high"), ("pressure", "low"), ("humidity", "high")),
+}
+
+
+def trimf(x, a, b, c):
+    """Triangular membership, equal to skfuzzy's trimf sampled by interp_membership."""
+    rise = (x - a) * (1.0 / (b - a)) if b > a else np.where(x >= a, 1.0, 0.0)
+    fall = (c - x) * (1.0 / (c - b)) if c > b else np.where(x <= c, 1.0, 0.0)
+    # one side is always <= 1, so only the lower end needs clipping
+    np.minimum(rise, fall, out=rise)
+    return np.maximum(rise, 0.0, out=rise)
+
+
+def fuzzy_scores(model, columns):
+    """Normalized fuzzy probabilities aligned with model.names (zero where the fuzzy model has no rule).
+
+    Missing (NaN) readings are skipped by the min; rows with no membership
+    at all get a zero row.
+    """
+    used = {key for name in model.names for key in FUZZY_RULES.get(name, ())}
+    memberships = {key: trimf(columns[FEATURE_INDEX[key[0]]], *FUZZY_SETS[key]) for key in used}
+    scores = np.zeros((len(columns[0]), len(model.names)))
+    for i, name in enumerate(model.names):
+        if name in FUZZY_RULES:
+            column = np.full(len(columns[0]), np.nan)
+            for key in FUZZY_RULES[name]:
+                np.fmin(column, memberships[key], out=column)
+            scores[:, i] = column
+    np.nan_to_num(scores, copy=False)
+    total = scores.sum(axis=1, keepdims=True)
+    np.divide(scores, total, out=scores, where=total > 0)
+    return scores
+
+
+def score_hybrid(wind_speed, pressure, temperature, humidity, gaussian_weight=0.5, fuzzy_weight=0.5, model=None):
+    """Score a chunk with both the Gaussian and the fuzzy model and fuse them.
+
+    Returns (gaussian, fuzzy, fused), each (rows, categories) in model.names
+    order. The fuzzy model only covers the categories in FUZZY_RULES, so it
+    only redistributes the Gaussian mass among those: fused is the weighted
+    average of the Gaussian posterior and the fuzzy scores scaled to that
+    mass, and keeps the Gaussian posterior elsewhere. Rows where no fuzzy
+    rule fires fall back to the Gaussian posterior.
+    """
+    model = model or default_model()
+    columns = as_columns(wind_speed, pressure, temperature, humidity)
+    gaussian = posteriors(log_scores(model, columns))
+    fuzzy = fuzzy_scores(model, columns)
+
+    covered = np.array([name in FUZZY_RULES for name in model.names])
+    covered_mass = gaussian[:, covered].sum(axis=1, keepdims=True)
+    fuzzy_share = np.where(fuzzy.any(axis=1, keepdims=True), fuzzy_weight / (gaussian_weight + fuzzy_weight), 0.0)
+    fused = fuzzy * (fuzzy_share * covered_mass)
+    fused[:, covered] += gaussian[:, covered] * (1.0 - fuzzy_share)
+    fused[:, ~covered] = gaussian[:, ~covered]
+    return gaussian, fuzzy, fused
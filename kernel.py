@@ -0,0 +1,149 @@
+import time
+
+import numpy as np
+
+import scoring
+from scoring import FEATURE_INDEX, PDF_FLOOR, default_model
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+HAVE_NUMBA = numba is not None
+
+# Operator codes of cond_op, in the order the kernel tests them
+OPERATORS = ("<", "<=", ">", ">=")
+
+
+if HAVE_NUMBA:
+    @numba.njit(inline="always")
+    def _pick(feature, x0, x1, x2, x3):
+        if feature == 0:
+            return x0
+        if feature == 1:
+            return x1
+        if feature == 2:
+            return x2
+        return x3
+
+    # cache=True keeps the compiled code in __pycache__, so only the first
+    # process after an edit pays for compilation
+    @numba.njit(parallel=True, nogil=True, cache=True)
+    def _fused_posteriors(wind_speed, pressure, temperature, humidity, means, inv_stds, log_norm,
+                          rule_category, rule_log_conf, rule_start, cond_feature, cond_op, cond_value, out):
+        n = wind_speed.shape[0]
+        k = means.shape[1]
+        for i in numba.prange(n):
+            x0, x1, x2, x3 = wind_speed[i], pressure[i], temperature[i], humidity[i]
+            row = out[i]
+            for c in range(k):
+                row[c] = 0.0
+            for f in range(4):
+                x = _pick(f, x0, x1, x2, x3)
+                if np.isnan(x):
+                    continue
+                for c in range(k):
+                    z = (x - means[f, c]) * inv_stds[f, c]
+                    row[c] += np.log(np.exp(log_norm[f, c] - 0.5 * z * z) + PDF_FLOOR)
+
+            for r in range(rule_category.shape[0]):
+                fired = True
+                for q in range(rule_start[r], rule_start[r + 1]):
+                    x = _pick(cond_feature[q], x0, x1, x2, x3)
+                    op = cond_op[q]
+                    value = cond_value[q]
+                    if op == 0:
+                        fired = x < value
+                    elif op == 1:
+                        fired = x <= value
+                    elif op == 2:
+                        fired = x > value
+                    else:
+                        fired = x >= value
+                    if not fired:
+                        break
+                if fired:
+                    row[rule_category[r]] += rule_log_conf[r]
+
+            best = row[0]
+            for c in range(1, k):
+                best = max(best, row[c])
+            total = 0.0
+            for c in range(k):
+                row[c] = np.exp(row[c] - best)
+                total += row[c]
+            for c in range(k):
+                row[c] /= total
+
+
+def _feature_major(model):
+    # (feature, category) copies keep the inner category loop contiguous
+    if not hasattr(model, "_feature_major"):
+        model._feature_major = tuple(np.ascontiguousarray(a.T) for a in (model.means, 1 / model.stds, model.log_norm))
+    return model._feature_major
+
+
+def _flat_rules(model):
+    # The kernel cannot walk model.rules, so the conditions of rule r are
+    # stored as cond_*[rule_start[r]:rule_start[r + 1]]
+    if not hasattr(model, "_flat_rules"):
+        conditions = [c for _, _, rule_conditions in model.rules for c in rule_conditions]
+        model._flat_rules = (
+            np.array([category for category, _, _ in model.rules], dtype=np.int64),
+            np.array([log_conf for _, log_conf, _ in model.rules], dtype=float),
+            np.cumsum([0] + [len(rule_conditions) for _, _, rule_conditions in model.rules]).astype(np.int64),
+            np.array([FEATURE_INDEX[f] for f, _, _ in conditions], dtype=np.int64),
+            np.array([OPERATORS.index(op) for _, op, _ in conditions], dtype=np.int64),
+            np.array([value for _, _, value in conditions], dtype=float),
+        )
+    return model._flat_rules
+
+
+def classify_columns(model, columns, out=None):
+    """Drop-in for scoring.classify_columns that uses the fused kernel when Numba is installed."""
+    if not HAVE_NUMBA:
+        return scoring.classify_columns(model, columns, out)
+    n = len(columns[0])
+    if out is None:
+        out = np.empty((n, len(model.names)))
+    out = out[:n]
+    _fused_posteriors(*(np.ascontiguousarray(x, dtype=np.float64) for x in columns),
+                      *_feature_major(model), *_flat_rules(model), out)
+    return out.argmax(axis=1), out
+
+
+def benchmark(n=1_000_000, repeat=3, seed=0):
+    """Time the NumPy path against the fused kernel on random readings."""
+    model = default_model()
+    rng = np.random.default_rng(seed)
+    columns = [rng.uniform(low, high, n) for low, high in ((0, 150), (900, 1050), (-20, 40), (0, 100))]
+
+    def best_of(fn):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(model, columns)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    print(f"{n} readings, best of {repeat}")
+    numpy_time = best_of(scoring.classify_columns)
+    print(f"NumPy:  {numpy_time:.3f} s ({n / numpy_time:,.0f} readings/s)")
+    if not HAVE_NUMBA:
+        print("Numba is not installed; only the NumPy path is available.")
+        return
+
+    start = time.perf_counter()
+    classify_columns(model, [x[:10] for x in columns])
+    print(f"First call (compile or load from cache): {time.perf_counter() - start:.3f} s")
+    kernel_time = best_of(classify_columns)
+    print(f"Kernel: {kernel_time:.3f} s ({n / kernel_time:,.0f} readings/s), "
+          f"{numpy_time / kernel_time:.1f}x faster on {numba.get_num_threads()} threads")
+
+    difference = np.abs(scoring.classify_columns(model, columns)[1] - classify_columns(model, columns)[1]).max()
+    print(f"Max posterior difference: {difference:.2e}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,245 @@
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from geopy.distance import geodesic
+
+from memory_usage import rss_bytes
+from rules_final import Storm, StormExpertSystem
+from scoring import FEATURES, classify_observation, distance_advices
+
+
+class LatencyHistogram:
+    """HDR-style histogram: microsecond values kept to `significant_bits` of precision."""
+
+    def __init__(self, significant_bits=7):
+        self.significant_bits = significant_bits
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        value = max(1, int(seconds * 1e6))
+        shift = max(0, value.bit_length() - self.significant_bits)
+        with self.lock:
+            self.counts[(value >> shift) << shift] += 1
+
+    def percentile(self, q):
+        """Latency in ms at or below which q percent of the requests completed."""
+        total = sum(self.counts.values())
+        if not total:
+            return None
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen >= total * q / 100:
+                return value / 1000
+        return max(self.counts) / 1000
+
+    def summary(self):
+        return {name: self.percentile(q) for name, q in
+                (("p50", 50), ("p90", 90), ("p99", 99), ("p999", 99.9), ("max", 100))}
+
+
+def sample_readings(n, seed=None, spread_km=300, weights=None):
+    """n readings drawn from the StormExpertSystem category Gaussians, with nearby locations.
+
+    weights maps category names to relative sampling weights; categories
+    left out are never drawn. By default every category is equally likely.
+    The user is placed up to about spread_km from the storm in each direction.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(StormExpertSystem.categories)
+    if weights is None:
+        weights = dict.fromkeys(names, 1.0)
+    unknown = set(weights) - set(names)
+    if unknown:
+        raise ValueError(f"Unknown categories: {', '.join(sorted(unknown))}")
+    p = np.array([weights.get(name, 0.0) for name in names], dtype=float)
+    if (p < 0).any() or p.sum() <= 0:
+        raise ValueError("Category weights must be non-negative and not all zero")
+    picks = rng.choice(len(names), n, p=p / p.sum())
+    readings = []
+    for i in picks:
+        params = StormExpertSystem.categories[names[i]]
+        reading = {f: float(rng.normal(*params[f])) for f in FEATURES}
+        storm = (float(rng.uniform(-50, 50)), float(rng.uniform(-170, 170)))
+        offset = spread_km / 111.0
+        reading["storm_location"] = storm
+        reading["user_location"] = (storm[0] + float(rng.uniform(-offset, offset)),
+                                    storm[1] + float(rng.uniform(-offset, offset)))
+        readings.append(reading)
+    return readings
+
+
+def classify_engine(reading):
+    """Full engine path: construct, reset, declare, run, normalize."""
+    engine = StormExpertSystem()
+    engine.reset()
+    engine.classifications = []
+    engine.advices = []
+    engine.declare(Storm(**reading))
+    engine.run()
+    engine.normalize_probabilities()
+    return engine.classifications, engine.advices
+
+
+def classify_core(reading):
+    """Vectorized-core path with the same outputs as classify_engine."""
+    classifications = classify_observation(*(reading[f] for f in FEATURES))
+    distance = geodesic(reading["storm_location"], reading["user_location"]).kilometers
+    return classifications, distance_advices(distance)
+
+
+TARGETS = {"engine": classify_engine, "core": classify_core}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    target = staticmethod(classify_engine)
+
+    def do_POST(self):
+        reading = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        reading["storm_location"] = tuple(reading["storm_location"])
+        reading["user_location"] = tuple(reading["user_location"])
+        classifications, advices = self.target(reading)
+        body = json.dumps({"classifications": [(c, float(p)) for c, p in classifications],
+                           "advices": [(a, float(p)) for a, p in advices]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_http_stand_in(target):
+    """Serve target on a local port; returns (server, url)."""
+    handler = type("Handler", (_Handler,), {"target": staticmethod(target)})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/classify"
+
+
+def http_client(url):
+    def call(reading):
+        request = urllib.request.Request(url, data=json.dumps(reading).encode(),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+    return call
+
+
+def run_load(call, readings, duration=10.0, rate=None, concurrency=4, rss_interval=0.5):
+    """Drive call with readings for duration seconds and return a report dict.
+
+    With rate (requests/s) requests are issued on a fixed schedule and latency
+    is measured from the scheduled start, so queueing delay is not hidden;
+    without it each of the concurrency workers sends back to back.
+    """
+    histogram = LatencyHistogram()
+    errors = Counter()
+    rss = []
+    done = threading.Event()
+    completed = [0]
+    lock = threading.Lock()
+
+    def one(reading, scheduled):
+        try:
+            call(reading)
+        except Exception as error:
+            with lock:
+                errors[type(error).__name__] += 1
+        histogram.record(time.perf_counter() - scheduled)
+        with lock:
+            completed[0] += 1
+
+    def sample_rss():
+        while not done.wait(rss_interval):
+            rss.append((round(time.perf_counter() - start, 3), rss_bytes()))
+
+    start = time.perf_counter()
+    threading.Thread(target=sample_rss, daemon=True).start()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if rate:
+            i = 0
+            while True:
+                scheduled = start + i / rate
+                if scheduled - start >= duration:
+                    break
+                time.sleep(max(0.0, scheduled - time.perf_counter()))
+                pool.submit(one, readings[i % len(readings)], scheduled)
+                i += 1
+        else:
+            def worker(offset):
+                i = offset
+                while time.perf_counter() - start < duration:
+                    one(readings[i % len(readings)], time.perf_counter())
+                    i += concurrency
+            for offset in range(concurrency):
+                pool.submit(worker, offset)
+    elapsed = time.perf_counter() - start
+    done.set()
+
+    return {
+        "requests": completed[0],
+        "errors": dict(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(completed[0] / elapsed, 1),
+        "latency_ms": histogram.summary(),
+        "rss_bytes": rss,
+    }
+
+
+def parse_weights(text):
+    """Parse "Calm=3,Severe Hurricane=1" (a bare name counts as weight 1)."""
+    weights = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight) if weight else 1.0
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the storm classification path.")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="engine")
+    parser.add_argument("--http", action="store_true", help="go through a local HTTP stand-in")
+    parser.add_argument("--rate", type=float, help="requests per second (default: as fast as possible)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--weights", type=parse_weights,
+                        help='category sampling weights, e.g. "Calm=3,Severe Hurricane=1"; '
+                             "unlisted categories are not sampled (default: all equally)")
+    parser.add_argument("--spread-km", type=float, default=300.0,
+                        help="how far users are placed from the storm in each direction")
+    parser.add_argument("--report", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    call = TARGETS[args.target]
+    server = None
+    if args.http:
+        server, url = start_http_stand_in(call)
+        call = http_client(url)
+    report = run_load(call, sample_readings(10_000, args.seed, args.spread_km, args.weights), args.duration, args.rate, args.concurrency)
+    if server is not None:
+        server.shutdown()
+    report["config"] = vars(args)
+
+    latency = report["latency_ms"]
+    print(f"{args.target}{' over HTTP' if args.http else ''}: {report['requests']} requests, "
+          f"{report['throughput_per_s']}/s, errors {report['errors'] or 0}")
+    print("latency ms: " + ", ".join(f"{name} {value:.3f}" for name, value in latency.items() if value is not None))
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import sys
+
+try:
+    import resource
+except ImportError:
+    # Windows has no resource module
+    resource = None
+
+
+def rss_bytes():
+    """Resident set size of this process in bytes, or None where it cannot be read.
+
+    Linux reports the current size from /proc. Elsewhere only the peak size
+    is available, from getrusage, which is in bytes on macOS and in
+    kilobytes on the other Unix systems.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,95 @@
+import numpy as np
+
+from scoring import FEATURE_INDEX, OPERATOR_FUNCS, as_columns, gaussian_scores
+
+
+class ModelStack:
+    """Several variants of a CategoryModel scored side by side in one pass.
+
+    The variants must share category names; their Gaussian tables and rule
+    confidences may differ. Input conversion and every distinct crisp-rule
+    condition are computed once for the whole stack, and the Gaussian terms
+    once per distinct parameter table, so variants that only retune
+    confidences cost little more than a single model.
+    """
+
+    def __init__(self, models):
+        self.models = list(models)
+        self.names = self.models[0].names
+        if any(model.names != self.names for model in self.models):
+            raise ValueError("All models in a stack must have the same categories in the same order")
+
+        # Distinct (means, stds) tables and which one each model uses
+        self.tables = []
+        self.table_of = []
+        for model in self.models:
+            for t, (means, stds, _) in enumerate(self.tables):
+                if np.array_equal(means, model.means) and np.array_equal(stds, model.stds):
+                    break
+            else:
+                t = len(self.tables)
+                self.tables.append((model.means, model.stds, model.log_norm))
+            self.table_of.append(t)
+
+        # Distinct conditions across all rules, and each model's rules over them
+        self.conditions = []
+        index = {}
+        self.model_rules = []
+        for model in self.models:
+            rules = []
+            for category, log_conf, conditions in model.rules:
+                ids = []
+                for condition in conditions:
+                    if condition not in index:
+                        index[condition] = len(self.conditions)
+                        self.conditions.append(condition)
+                    ids.append(index[condition])
+                rules.append((category, log_conf, ids))
+            self.model_rules.append(rules)
+
+    def log_scores(self, columns):
+        """(rows, models, categories) log scores, each equal to scoring.log_scores for that model."""
+        n, m, k = len(columns[0]), len(self.models), len(self.names)
+        per_table = [gaussian_scores(means, stds, log_norm, columns) for means, stds, log_norm in self.tables]
+
+        out = np.empty((n, m, k))
+        for i, t in enumerate(self.table_of):
+            out[:, i] = per_table[t]
+
+        held = np.empty((n, len(self.conditions)), dtype=bool)
+        for c, (feature, op, value) in enumerate(self.conditions):
+            held[:, c] = OPERATOR_FUNCS[op](columns[FEATURE_INDEX[feature]], value)
+        for i, rules in enumerate(self.model_rules):
+            for category, log_conf, ids in rules:
+                out[held[:, ids].all(axis=1), i, category] += log_conf
+        return out
+
+    def posteriors(self, wind_speed, pressure, temperature, humidity):
+        """(rows, models, categories) posterior tensor for a batch of readings."""
+        scores = self.log_scores(as_columns(wind_speed, pressure, temperature, humidity))
+        scores -= scores.max(axis=2, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=2, keepdims=True)
+        return scores
+
+
+def agreement(posteriors):
+    """Agreement statistics for a (rows, models, categories) posterior tensor.
+
+    pairwise[i, j] is the share of rows where models i and j pick the same
+    top category, with_majority the share where each model agrees with the
+    most common pick, and mean_tv the mean total-variation distance of each
+    model's posterior from the first model's.
+    """
+    top = posteriors.argmax(axis=2)
+    pairwise = (top[:, :, None] == top[:, None, :]).mean(axis=0)
+    votes = np.zeros(posteriors.shape[::2], dtype=np.int64)
+    rows = np.arange(len(top))
+    for i in range(top.shape[1]):
+        votes[rows, top[:, i]] += 1
+    majority = votes.argmax(axis=1)
+    return {
+        "pairwise": pairwise,
+        "with_majority": (top == majority[:, None]).mean(axis=0),
+        "mean_tv": 0.5 * np.abs(posteriors - posteriors[:, :1]).sum(axis=2).mean(axis=0),
+    }
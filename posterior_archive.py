@@ -0,0 +1,87 @@
+import json
+import os
+
+import numpy as np
+
+FORMAT_VERSION = 1
+DTYPES = {8: np.uint8, 16: np.uint16}
+
+
+class PosteriorArchive:
+    """Append-only store of quantized category posteriors.
+
+    A directory holding header.json (category names, whose positions are the
+    category ids, and the quantization) and posteriors.bin, a flat array of
+    one fixed-width record per observation. Each posterior p is stored as
+    round(p * scale) with scale = 2**bits - 1, so a read-back value is within
+    0.5 / scale of the original: 1.96e-3 for 8 bits, 7.63e-6 for 16 bits.
+    """
+
+    def __init__(self, path, categories=None, bits=8):
+        self.path = path
+        header_path = os.path.join(path, "header.json")
+        if os.path.exists(header_path):
+            with open(header_path) as f:
+                header = json.load(f)
+            if header["format"] != FORMAT_VERSION:
+                raise ValueError(f"Unsupported posterior archive format {header['format']} in {path}")
+            if categories is not None and list(categories) != header["categories"]:
+                raise ValueError(f"Archive {path} was written with different categories")
+        else:
+            if categories is None:
+                raise ValueError(f"No archive at {path}; categories are required to create one")
+            if bits not in DTYPES:
+                raise ValueError(f"bits must be one of {sorted(DTYPES)}, not {bits}")
+            header = {"format": FORMAT_VERSION, "categories": list(categories), "bits": bits}
+            os.makedirs(path, exist_ok=True)
+            with open(header_path, "w") as f:
+                json.dump(header, f, indent=2)
+
+        self.categories = header["categories"]
+        self.dtype = np.dtype(DTYPES[header["bits"]])
+        self.scale = 2 ** header["bits"] - 1
+        self.data_path = os.path.join(path, "posteriors.bin")
+        self.record_size = self.dtype.itemsize * len(self.categories)
+
+    def __len__(self):
+        if not os.path.exists(self.data_path):
+            return 0
+        return os.path.getsize(self.data_path) // self.record_size
+
+    def append(self, posteriors):
+        """Quantize and append an (observations, categories) array of posteriors."""
+        posteriors = np.asarray(posteriors, dtype=float)
+        if posteriors.ndim != 2 or posteriors.shape[1] != len(self.categories):
+            raise ValueError(f"Expected shape (n, {len(self.categories)}), got {posteriors.shape}")
+        quantized = np.rint(np.clip(posteriors, 0.0, 1.0) * self.scale).astype(self.dtype)
+        with open(self.data_path, "ab") as f:
+            # Drop a torn record left by an interrupted write so later records stay aligned
+            f.truncate(len(self) * self.record_size)
+            f.write(quantized.tobytes())
+
+    def append_classifications(self, classifications):
+        """Append one observation given as normalize_probabilities' (category, probability) list."""
+        row = np.zeros((1, len(self.categories)))
+        index = {name: i for i, name in enumerate(self.categories)}
+        for category, probability in classifications:
+            row[0, index[category]] = probability
+        self.append(row)
+
+    def _records(self):
+        if len(self) == 0:
+            return np.empty((0, len(self.categories)), dtype=self.dtype)
+        return np.memmap(self.data_path, dtype=self.dtype, mode="r", shape=(len(self), len(self.categories)))
+
+    def read(self, start=0, stop=None):
+        """Posteriors of observations start..stop as a float32 array."""
+        return self[start:stop]
+
+    def __getitem__(self, index):
+        """Posteriors for an observation index, slice or index array."""
+        records = self._records()[index]
+        return records.astype(np.float32) / np.float32(self.scale)
+
+    def top_categories(self, start=0, stop=None):
+        """Category ids of the most likely category for observations start..stop."""
+        ids = self._records()[start:stop].argmax(axis=1)
+        return ids.astype(np.min_scalar_type(len(self.categories) - 1))
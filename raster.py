@@ -0,0 +1,52 @@
+import numpy as np
+
+from scoring import classify_columns, default_model, distance_km, distance_tier
+
+TILE_SIZE = 1 << 16
+
+
+def classify_grid(wind_speed, pressure, temperature, humidity, model=None, tile_size=TILE_SIZE):
+    """Classify every cell of gridded model output, one tile of cells at a time.
+
+    The four fields share a shape such as (lat, lon) or (time, lat, lon).
+    Returns the category-index map and the max-posterior map in that shape.
+    Masked or NaN cells are marginalized, as in scoring.log_scores.
+    """
+    model = model or default_model()
+    fields = [np.ma.asarray(field) for field in (wind_speed, pressure, temperature, humidity)]
+    shape = fields[0].shape
+    if any(field.shape != shape for field in fields):
+        raise ValueError(f"Fields have different shapes: {[field.shape for field in fields]}")
+
+    flat = [field.reshape(-1) for field in fields]
+    categories = np.empty(flat[0].size, dtype=np.min_scalar_type(len(model.names) - 1))
+    confidence = np.empty(flat[0].size, dtype=np.float32)
+    buffer = np.empty((tile_size, len(model.names)))
+    for start in range(0, flat[0].size, tile_size):
+        stop = start + tile_size
+        tile = [np.ma.filled(np.ma.asarray(field[start:stop], dtype=float), np.nan) for field in flat]
+        categories[start:stop], scores = classify_columns(model, tile, buffer)
+        confidence[start:stop] = scores.max(axis=1)
+    return categories.reshape(shape), confidence.reshape(shape)
+
+
+def distance_tier_grid(lats, lons, centers, tile_size=TILE_SIZE):
+    """Distance tier of every (lat, lon) cell to its nearest storm center.
+
+    lats and lons are the 1-D grid axes, centers a sequence of (lat, lon).
+    Returns a (len(lats), len(lons)) map of indices into TIER_ADVICE. The
+    distances are spherical (scoring.distance_km), so cells within about
+    1.2 km of a tier bound can get a different tier than classify_storm's
+    geodesic distance gives them.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    tiers = np.empty((lats.size, lons.size), dtype=np.uint8)
+    rows = max(1, tile_size // max(1, lons.size))
+    for start in range(0, lats.size, rows):
+        block = lats[start:start + rows, None]
+        nearest = np.full((block.shape[0], lons.size), np.inf)
+        for center_lat, center_lon in centers:
+            np.minimum(nearest, distance_km(block, lons[None, :], center_lat, center_lon), out=nearest)
+        tiers[start:start + rows] = distance_tier(nearest)
+    return tiers
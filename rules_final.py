@@ -1,15 +1,21 @@
 from experta import *
+from collections import deque
+import time
 import numpy as np
 from scipy.stats import norm
 from geopy.distance import geodesic
+from memory_usage import rss_bytes
 
 class Storm(Fact):
     """Information about the storm."""
     pass
 
 class StormExpertSystem(KnowledgeEngine):
-    classifications = []
-    advices = []
+    def __init__(self):
+        super().__init__()
+        # Per engine, so engines in different threads never share results
+        self.classifications = []
+        self.advices = []
 
     categories = {
         "Mild Hurricane": {"wind_speed": (85, 5), "pressure": (970, 10), "temperature": (25, 5), "humidity": (80, 10)},
@@ -40,7 +46,7 @@ class StormExpertSystem(KnowledgeEngine):
         "Low Humidity": "Moisturize and stay hydrated."
     }
 
-    @Rule(Storm(wind_speed=MATCH.wind_speed, pressure=MATCH.pressure, temperature=MATCH.temperature, humidity=MATCH.humidity, storm_location=MATCH.storm_location, user_location=MATCH.user_location))
+    @Rule(Storm(wind_speed=MATCH.wind_speed, pressure=MATCH.pressure, temperature=MATCH.temperature, humidity=MATCH.humidity, storm_location=MATCH.storm_location, user_location=MATCH.user_location), salience=1)
     def classify_storm(self, wind_speed, pressure, temperature, humidity, storm_location, user_location):
         for category, params in self.categories.items():
             wind_log_prob = np.log(norm.pdf(wind_speed, params["wind_speed"][0], params["wind_speed"][1]) + 1e-10)
@@ -145,3 +151,59 @@ class StormExpertSystem(KnowledgeEngine):
         normalized_advice_probs = [exp_prob / total_exp_advice_prob for exp_prob in exp_advice_probs]
 
         self.advices = [(advice, normalized_advice_probs[i]) for i, (advice, _) in enumerate(self.advices)]
+
+
+class BoundedStormExpertSystem(StormExpertSystem):
+    """StormExpertSystem that can stay alive for days.
+
+    Storm facts are retracted once more than max_facts are held or once they
+    are older than max_age seconds, so the fact list, the rule network's
+    memories and the cost of each run() stay flat.
+    """
+
+    # Fields classify_storm matches; without all of them no category is scored
+    REQUIRED = ("wind_speed", "pressure", "temperature", "humidity", "storm_location", "user_location")
+
+    def __init__(self, max_facts=1000, max_age=3600.0):
+        super().__init__()
+        self.max_facts = max_facts
+        self.max_age = max_age
+        self.storm_facts = deque()
+        self.reset()
+
+    def reset(self, **kwargs):
+        super().reset(**kwargs)
+        # Repeated readings must classify again instead of being dropped as duplicates
+        self.facts.duplication = True
+        self.storm_facts.clear()
+
+    def classify(self, **storm):
+        """Declare one Storm, run the engine and return its (classifications, advices).
+
+        Raises ValueError if any of REQUIRED is missing or None.
+        """
+        missing = [name for name in self.REQUIRED if storm.get(name) is None]
+        if missing:
+            raise ValueError(f"Storm reading is missing {', '.join(missing)}")
+        self.classifications = []
+        self.advices = []
+        self.storm_facts.append((time.monotonic(), self.declare(Storm(**storm))))
+        self.run()
+        self.normalize_probabilities()
+        self.retract_stale()
+        return self.classifications, self.advices
+
+    def retract_stale(self):
+        now = time.monotonic()
+        while self.storm_facts and (len(self.storm_facts) > self.max_facts
+                                    or now - self.storm_facts[0][0] > self.max_age):
+            _, fact = self.storm_facts.popleft()
+            self.retract(fact)
+
+    def gauges(self):
+        return {
+            "facts": len(self.facts),
+            "storm_facts": len(self.storm_facts),
+            "agenda": len(self.agenda.activations),
+            "rss_bytes": rss_bytes(),
+        }
@@ -0,0 +1,216 @@
+from functools import lru_cache
+
+import numpy as np
+
+FEATURES = ("wind_speed", "pressure", "temperature", "humidity")
+FEATURE_INDEX = {feature: i for i, feature in enumerate(FEATURES)}
+
+# classify_storm adds this to every pdf before taking the log
+PDF_FLOOR = 1e-10
+
+# Crisp rules of StormExpertSystem as (category, confidence, conditions).
+# The humidity rules only adjust advice names that are not categories, so they
+# never change a classification and are left out.
+CRISP_RULES = (
+    ("Mild Hurricane", 0.8, (("wind_speed", ">=", 74), ("wind_speed", "<", 96), ("pressure", "<=", 980))),
+    ("Moderate Hurricane", 0.9, (("wind_speed", ">=", 96), ("wind_speed", "<", 111), ("pressure", "<=", 970))),
+    ("Severe Hurricane", 0.95, (("wind_speed", ">=", 111), ("pressure", "<=", 950))),
+    ("Mild Thunderstorm", 0.7, (("wind_speed", "<", 74), ("temperature", ">", 20), ("pressure", ">", 980))),
+    ("Moderate Thunderstorm", 0.8, (("wind_speed", ">=", 40), ("wind_speed", "<", 60), ("temperature", ">", 20),
+                                    ("pressure", "<=", 1000))),
+    ("Severe Thunderstorm", 0.85, (("wind_speed", ">=", 60), ("temperature", ">", 20), ("pressure", "<=", 990))),
+    ("Mild Winter Storm", 0.75, (("wind_speed", ">=", 40), ("wind_speed", "<", 60), ("pressure", "<=", 1000),
+                                 ("temperature", "<=", 0))),
+    ("Moderate Winter Storm", 0.85, (("wind_speed", ">=", 60), ("wind_speed", "<", 80), ("pressure", "<=", 980),
+                                     ("temperature", "<=", -5))),
+    ("Severe Winter Storm", 0.9, (("wind_speed", ">=", 80), ("pressure", "<=", 960), ("temperature", "<=", -10))),
+    ("Calm", 1.0, (("wind_speed", "<", 30), ("pressure", ">", 1000))),
+)
+
+OPERATOR_FUNCS = {"<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal}
+
+# Distance advice tiers used by classify_storm
+TIER_BOUNDS_KM = (50, 100, 200)
+TIER_ADVICE = (
+    "Move away immediately!",
+    "Prepare to evacuate.",
+    "Stay alert and monitor the situation.",
+    "You are safe for now.",
+)
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+class CategoryModel:
+    """Array form of a categories table and the crisp rules that adjust it."""
+
+    def __init__(self, categories, rules=CRISP_RULES):
+        self.names = list(categories)
+        self.means = np.array([[categories[c][f][0] for f in FEATURES] for c in self.names], dtype=float)
+        self.stds = np.array([[categories[c][f][1] for f in FEATURES] for c in self.names], dtype=float)
+        self.log_norm = -np.log(self.stds * np.sqrt(2 * np.pi))
+
+        index = {name: i for i, name in enumerate(self.names)}
+        self.rules = [(index[category], np.log(confidence), conditions)
+                      for category, confidence, conditions in rules if category in index]
+
+
+def build_model(categories=None, rules=CRISP_RULES):
+    """Build a CategoryModel, by default from StormExpertSystem.categories."""
+    if categories is None:
+        from rules_final import StormExpertSystem
+        categories = StormExpertSystem.categories
+    return CategoryModel(categories, rules)
+
+
+@lru_cache(maxsize=1)
+def default_model():
+    return build_model()
+
+
+def as_columns(wind_speed, pressure, temperature, humidity):
+    """Return the four features as 1-D float arrays of equal length.
+
+    Missing readings (None, NaN or masked entries) come back as NaN.
+    """
+    columns = [np.atleast_1d(np.ma.filled(np.ma.asarray(x, dtype=float), np.nan))
+               for x in (wind_speed, pressure, temperature, humidity)]
+    return np.broadcast_arrays(*columns)
+
+
+def rule_mask(conditions, columns):
+    """Rows of columns for which every condition of a crisp rule holds."""
+    fired = None
+    for feature, op, value in conditions:
+        hit = OPERATOR_FUNCS[op](columns[FEATURE_INDEX[feature]], value)
+        fired = hit if fired is None else fired & hit
+    return fired
+
+
+def gaussian_scores(means, stds, log_norm, columns, out=None):
+    """Summed floored Gaussian log-pdfs for (categories, features) tables, skipping NaN readings."""
+    n = len(columns[0])
+    if out is None:
+        out = np.empty((n, len(means)))
+    out = out[:n]
+    out[...] = 0.0
+    term = np.empty_like(out)
+    for f, x in enumerate(columns):
+        np.subtract(x[:, None], means[:, f], out=term)
+        term /= stds[:, f]
+        np.square(term, out=term)
+        term *= -0.5
+        term += log_norm[:, f]
+        np.exp(term, out=term)
+        term += PDF_FLOOR
+        np.log(term, out=term)
+        missing = np.isnan(x)
+        if missing.any():
+            term[missing] = 0.0
+        out += term
+    return out
+
+
+def log_scores(model, columns, out=None):
+    """Log-likelihood of every category for every row, after the crisp rules.
+
+    columns holds one 1-D array per feature in FEATURES order. The result has
+    shape (rows, categories); pass out to reuse a buffer between chunks.
+
+    NaN readings are marginalized out: the categories are products of
+    independent Gaussians, so a missing feature just drops its term, and any
+    crisp rule that tests it does not fire (as with a Storm fact lacking it).
+    """
+    out = gaussian_scores(model.means, model.stds, model.log_norm, columns, out)
+    for category, log_conf, conditions in model.rules:
+        out[rule_mask(conditions, columns), category] += log_conf
+    return out
+
+
+def posteriors(scores):
+    """Normalize log scores row-wise in place, as normalize_probabilities does."""
+    scores -= scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=1, keepdims=True)
+    return scores
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km (same formula as geopy's great_circle)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=float)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distance_tier(distance):
+    """Index into TIER_ADVICE for each distance, with classify_storm's bounds.
+
+    Tiers match classify_storm only for geodesic distances; distance_km's
+    spherical ones can be off by up to about 0.6%, enough to cross a bound.
+    """
+    return np.searchsorted(TIER_BOUNDS_KM, distance, side="right")
+
+
+def distance_advices(distance):
+    """The two (advice, 1.0) entries classify_storm appends for a distance in km."""
+    return [(f"Distance to storm: {distance:.2f} km", 1.0), (TIER_ADVICE[distance_tier(distance)], 1.0)]
+
+
+def classify_columns(model, columns, out=None):
+    """Score one chunk of columns; returns (category index, posterior matrix)."""
+    scores = posteriors(log_scores(model, columns, out))
+    return scores.argmax(axis=1), scores
+
+
+def classify_observation(wind_speed, pressure, temperature, humidity, model=None):
+    """(category, probability) pairs for one reading; None marks a missing feature."""
+    model = model or default_model()
+    _, scores = classify_columns(model, as_columns(wind_speed, pressure, temperature, humidity))
+    return list(zip(model.names, scores[0]))
+
+
+def check_engine_parity(readings=200, seed=0, tolerance=1e-9):
+    """Classify random readings with StormExpertSystem and classify_observation; returns the mismatches.
+
+    Every other reading drops one or two features. classify_storm needs all
+    four, so for those the engine is seeded with its log-likelihoods over the
+    present features and only its crisp rules run on the partial Storm fact.
+    Each mismatch is (reading, engine classifications, core classifications).
+    """
+    from scipy.stats import norm
+    from rules_final import Storm, StormExpertSystem
+
+    rng = np.random.default_rng(seed)
+    ranges = ((0, 150), (900, 1050), (-20, 40), (0, 100))
+    mismatches = []
+    for i in range(readings):
+        reading = {f: float(rng.uniform(low, high)) for f, (low, high) in zip(FEATURES, ranges)}
+        if i % 2:
+            for f in rng.choice(FEATURES, rng.integers(1, 3), replace=False):
+                reading[f] = None
+        present = {f: x for f, x in reading.items() if x is not None}
+
+        engine = StormExpertSystem()
+        engine.reset()
+        if len(present) == len(FEATURES):
+            engine.declare(Storm(**present, storm_location=(0.0, 0.0), user_location=(0.0, 1.0)))
+        else:
+            for category, params in engine.categories.items():
+                log_prob = sum(np.log(norm.pdf(x, *params[f]) + PDF_FLOOR) for f, x in present.items())
+                engine.classifications.append((category, log_prob))
+                engine.advices.append((engine.advice_map[category], log_prob))
+            engine.declare(Storm(**present))
+        engine.run()
+        engine.normalize_probabilities()
+
+        core = classify_observation(*(reading[f] for f in FEATURES))
+        expected = dict(engine.classifications)
+        if any(abs(expected[category] - probability) > tolerance for category, probability in core):
+            mismatches.append((reading, engine.classifications, core))
+    return mismatches
+
+
+if __name__ == "__main__":
+    readings = 200
+    mismatches = check_engine_parity(readings)
+    print(f"StormExpertSystem and classify_observation disagree on {len(mismatches)} of {readings} readings")
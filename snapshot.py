@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+from scoring import CategoryModel
+
+SNAPSHOT_FORMAT = 2
+ARRAYS = ("means", "stds", "log_norm")
+# Sources that define the model; any edit to them invalidates old snapshots
+MODEL_SOURCES = ("rules_final.py", "scoring.py")
+
+
+def model_version():
+    """Hash of the model's source files, read from disk without importing them."""
+    digest = hashlib.sha256(str(SNAPSHOT_FORMAT).encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in MODEL_SOURCES:
+        with open(os.path.join(here, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def save_snapshot(path, model=None, advice_map=None):
+    """Write a ready-to-serve model (and advice map) to an .npz file.
+
+    The file is written under a temporary name and renamed into place, so
+    a process loading it concurrently sees the old or the new snapshot,
+    never a partial one.
+    """
+    if model is None or advice_map is None:
+        from rules_final import StormExpertSystem
+        from scoring import default_model
+        model = model or default_model()
+        advice_map = advice_map or StormExpertSystem.advice_map
+    header = {
+        "version": model_version(),
+        "names": model.names,
+        "rules": [[category, log_conf, [list(c) for c in conditions]]
+                  for category, log_conf, conditions in model.rules],
+        "advice_map": advice_map,
+    }
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                     prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, header=np.array(json.dumps(header)), **{name: getattr(model, name) for name in ARRAYS})
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def load_snapshot(path):
+    """Restore (model, advice_map) from a snapshot.
+
+    Raises ValueError if the snapshot was written for a different model
+    version, so a stale snapshot is never served.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        header = json.loads(str(data["header"]))
+        if header["version"] != model_version():
+            raise ValueError(f"Snapshot {path} is stale: it was built from a different model version")
+        model = CategoryModel.__new__(CategoryModel)
+        for name in ARRAYS:
+            setattr(model, name, data[name])
+    model.names = header["names"]
+    model.rules = [(category, log_conf, tuple(tuple(c) for c in conditions))
+                   for category, log_conf, conditions in header["rules"]]
+    return model, header["advice_map"]
+
+
+def warm_start(path):
+    """Load the snapshot at path, rebuilding and rewriting it if missing, stale or unreadable."""
+    if os.path.exists(path):
+        try:
+            return load_snapshot(path)
+        except (ValueError, KeyError, EOFError, OSError, zipfile.BadZipFile):
+            pass
+    save_snapshot(path)
+    return load_snapshot(path)
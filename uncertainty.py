@@ -0,0 +1,61 @@
+import numpy as np
+
+from scoring import FEATURES, as_columns, default_model, log_scores, posteriors
+
+BUFFER_BYTES = 1 << 25
+
+
+def draw_errors(errors, samples, rng):
+    """(samples, features) sensor-error draws.
+
+    errors maps a feature to its error distribution: a number is a Gaussian
+    standard deviation, ("normal", sd) the same, and ("uniform", half_width)
+    a uniform error. Features left out are taken as exact.
+    """
+    draws = np.zeros((samples, len(FEATURES)))
+    for f, feature in enumerate(FEATURES):
+        error = errors.get(feature)
+        if error is None:
+            continue
+        kind, width = ("normal", error) if np.isscalar(error) else error
+        if kind == "normal":
+            draws[:, f] = rng.normal(0.0, width, samples)
+        elif kind == "uniform":
+            draws[:, f] = rng.uniform(-width, width, samples)
+        else:
+            raise ValueError(f"Unknown error distribution for {feature}: {kind}")
+    return draws
+
+
+def propagate(wind_speed, pressure, temperature, humidity, errors, samples=2000, interval=0.9, model=None, seed=None):
+    """Monte Carlo posteriors for readings with sensor error.
+
+    Every reading is perturbed by the same set of error draws and the
+    perturbed copies are scored in batches through log_scores, crisp rules
+    included, reusing one score buffer of about BUFFER_BYTES. Returns
+    (mean, lower, upper, agreement): the posterior mean and the central
+    credible interval per category, each (readings, categories), and the
+    share of samples whose top category matches the top category of the mean.
+    """
+    model = model or default_model()
+    rng = np.random.default_rng(seed)
+    columns = as_columns(wind_speed, pressure, temperature, humidity)
+    draws = draw_errors(errors, samples, rng)
+    n, k = len(columns[0]), len(model.names)
+
+    batch = max(1, BUFFER_BYTES // (samples * k * 8))
+    buffer = np.empty((batch * samples, k))
+    mean = np.empty((n, k))
+    lower = np.empty((n, k))
+    upper = np.empty((n, k))
+    agreement = np.empty(n)
+    quantiles = ((1 - interval) / 2, (1 + interval) / 2)
+    for start in range(0, n, batch):
+        stop = min(start + batch, n)
+        perturbed = [(x[start:stop, None] + draws[:, f]).ravel() for f, x in enumerate(columns)]
+        scores = posteriors(log_scores(model, perturbed, buffer)).reshape(stop - start, samples, k)
+        mean[start:stop] = scores.mean(axis=1)
+        lower[start:stop], upper[start:stop] = np.quantile(scores, quantiles, axis=1)
+        top = mean[start:stop].argmax(axis=1)
+        agreement[start:stop] = (scores.argmax(axis=2) == top[:, None]).mean(axis=1)
+    return mean, lower, upper, agreement
@@ -0,0 +1,81 @@
+import numpy as np
+from geopy.distance import geodesic
+
+from scoring import FEATURE_INDEX, OPERATOR_FUNCS, PDF_FLOOR, default_model, distance_advices
+
+
+class WhatIf:
+    """One reading whose classification is updated as single inputs change.
+
+    Each feature's log-likelihood column and the crisp-rule conditions on it
+    are cached, so update() only recomputes what a changed input touches, and
+    the geodesic distance only when a location changes. None or NaN marks a
+    missing feature, which is marginalized as in scoring.log_scores.
+    """
+
+    def __init__(self, model=None, **reading):
+        self.model = model or default_model()
+        self.values = dict.fromkeys(FEATURE_INDEX)
+        self.terms = np.zeros((len(FEATURE_INDEX), len(self.model.names)))
+        # held[r][q]: whether condition q of crisp rule r holds
+        self.held = [np.zeros(len(conditions), dtype=bool) for _, _, conditions in self.model.rules]
+        self.storm_location = None
+        self.user_location = None
+        self.distance = None
+        self.update(**reading)
+
+    def _set_feature(self, feature, value):
+        model = self.model
+        f = FEATURE_INDEX[feature]
+        if value is not None and np.isnan(value):
+            value = None
+        self.values[feature] = value
+        for held, (_, _, conditions) in zip(self.held, model.rules):
+            for q, (name, op, threshold) in enumerate(conditions):
+                if name == feature:
+                    held[q] = value is not None and OPERATOR_FUNCS[op](value, threshold)
+        if value is None:
+            self.terms[f] = 0.0
+            return
+        term = (value - model.means[:, f]) / model.stds[:, f]
+        self.terms[f] = np.log(np.exp(-0.5 * term ** 2 + model.log_norm[:, f]) + PDF_FLOOR)
+
+    def update(self, **changes):
+        """Change any of the four features or the two locations; returns classifications()."""
+        locations_changed = False
+        for name, value in changes.items():
+            if name in FEATURE_INDEX:
+                if value != self.values[name]:
+                    self._set_feature(name, value)
+            elif name in ("storm_location", "user_location"):
+                if value != getattr(self, name):
+                    setattr(self, name, value)
+                    locations_changed = True
+            else:
+                raise TypeError(f"Unknown input: {name}")
+
+        if locations_changed:
+            if self.storm_location is None or self.user_location is None:
+                self.distance = None
+            else:
+                self.distance = geodesic(self.storm_location, self.user_location).kilometers
+        return self.classifications()
+
+    def classifications(self):
+        """(category, probability) pairs, as normalize_probabilities leaves them."""
+        model = self.model
+        scores = np.zeros(len(model.names))
+        for term in self.terms:
+            scores += term
+        for held, (category, log_conf, _) in zip(self.held, model.rules):
+            if held.all():
+                scores[category] += log_conf
+        scores = np.exp(scores - scores.max())
+        scores /= scores.sum()
+        return list(zip(model.names, scores))
+
+    def advices(self):
+        """Distance advice in the form classify_storm appends it; empty without both locations."""
+        if self.distance is None:
+            return []
+        return distance_advices(self.distance)